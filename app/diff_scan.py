@@ -0,0 +1,129 @@
+"""
+Diff scanning helpers shared by the rule checks, the API and the demo.
+
+Kept free of third-party imports so the standalone demo can use them too.
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import AnyStr, Iterator, Set, Tuple, Union
+
+try:
+    # RE2 compiles to an automaton with guaranteed linear-time matching
+    import re2 as re
+except ImportError:
+    import re
+
+
+def diff_fingerprint(diff: Union[str, bytes]) -> str:
+    """
+    Stable fingerprint of a diff, used as the review cache key everywhere.
+    
+    A hex string, so the same key can back a shared cache (e.g. Redis) across
+    workers; str and bytes forms of the same diff get the same fingerprint.
+    BLAKE2b is several times faster than SHA-256 in software, so hashing
+    even a multi-MB diff stays negligible next to the review itself.
+    """
+    if isinstance(diff, str):
+        diff = diff.encode()
+    return hashlib.blake2b(diff, digest_size=16).hexdigest()
+
+
+_HUNK_HEADER_RX = {
+    str: re.compile(r'@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@'),
+    bytes: re.compile(rb'@@ -\d+(?:,(\d+))? \+\d+(?:,(\d+))? @@'),
+}
+
+# (newline, carriage return, added, removed, no-newline marker, hunk start,
+# next file, file headers) for str and for bytes diffs
+_STR_TOKENS = ('\n', '\r', '+', '-', '\\', '@@', 'diff ', ('+++ ', '--- '))
+_TOKENS = {
+    str: _STR_TOKENS,
+    bytes: tuple(
+        tuple(t.encode() for t in token) if isinstance(token, tuple) else token.encode()
+        for token in _STR_TOKENS
+    ),
+}
+
+
+def changed_lines(diff: AnyStr) -> Iterator[AnyStr]:
+    """
+    Yield the added and removed lines of a diff, '+'/'-' marker included.
+    
+    Works on str and bytes diffs alike. The diff is split on '\\n' only:
+    str.splitlines() also breaks on form feeds, \\x1c-\\x1e, \\u2028 and
+    friends, which are ordinary characters inside code. Within a hunk the @@
+    line counts say exactly which lines are content, so a changed line whose
+    code starts with '++' or '--' is not mistaken for a header; outside hunks
+    (hand-written diffs) only '+++ '/'--- ' lines are file headers.
+    """
+    newline, cr, plus, minus, no_newline, hunk, next_file, headers = _TOKENS[type(diff)]
+    header_rx = _HUNK_HEADER_RX[type(diff)]
+    old_left = new_left = 0
+    
+    for line in diff.split(newline):
+        if line.endswith(cr):
+            line = line[:-1]
+        
+        if old_left > 0 or new_left > 0:
+            if line.startswith(next_file):
+                # Miscounted hunk; the next file starts here
+                old_left = new_left = 0
+                continue
+            marker = line[:1]
+            if marker == plus:
+                new_left -= 1
+                yield line
+            elif marker == minus:
+                old_left -= 1
+                yield line
+            elif marker != no_newline:
+                # Context line ("\ No newline at end of file" is not one)
+                old_left -= 1
+                new_left -= 1
+            continue
+        
+        if line.startswith(hunk):
+            match = header_rx.match(line)
+            if match:
+                old_left = int(match.group(1) or 1)
+                new_left = int(match.group(2) or 1)
+        elif line.startswith((plus, minus)) and not line.startswith(headers):
+            yield line
+
+
+@lru_cache(maxsize=None)
+def _alternation_rx(patterns: Tuple[bytes, ...]):
+    """
+    One alternation over the patterns (group i + 1 -> patterns[i]), so the
+    text is scanned in a single pass instead of once per pattern.
+    
+    Compiled as bytes: RE2 re-encodes a str argument on every search() call.
+    """
+    return re.compile(b"|".join(b"(" + pattern + b")" for pattern in patterns))
+
+
+def regex_rule_hits(patterns: Tuple[bytes, ...], data: bytes) -> Set[int]:
+    """
+    Indexes of every pattern matching data, overlapping matches included.
+    
+    finditer() would skip any rule whose text lies inside another rule's
+    match (eval inside a password literal). Instead, each hit rule is dropped
+    from the alternation and the search resumes at that match's start: no
+    remaining rule can match earlier, so every rule is found - the same hits
+    Hyperscan reports - in at most one search per rule.
+    """
+    hits: Set[int] = set()
+    remaining = tuple(range(len(patterns)))
+    start = 0
+    
+    while remaining:
+        match = _alternation_rx(tuple(patterns[i] for i in remaining)).search(data, start)
+        if match is None:
+            break
+        index = remaining[match.lastindex - 1]
+        hits.add(index)
+        remaining = tuple(i for i in remaining if i != index)
+        start = match.start()
+    
+    return hits
@@ -11,6 +11,8 @@ import argparse
 import json
 import sys
 from pathlib import Path
+
+import orjson
 from dotenv import load_dotenv
 
 from app.models import PRDiff
@@ -29,8 +31,8 @@ def save_output(output, filepath: str):
     output_dir = Path(filepath).parent
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(filepath, 'w') as f:
-        json.dump(output.model_dump(), f, indent=2)
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(output.model_dump(), option=orjson.OPT_INDENT_2))
     
     print(f"\n✓ Review output saved to: {filepath}")
 
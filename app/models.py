@@ -3,6 +3,7 @@ Data models for code review assistant.
 Using Pydantic for validation and type safety.
 """
 
+from dataclasses import dataclass
 from typing import Optional, List, Literal
 from pydantic import BaseModel, Field
 
@@ -19,6 +20,24 @@ class Issue(BaseModel):
     file_path: Optional[str] = Field(None, description="File path if applicable")
 
 
+@dataclass(slots=True)
+class RuleIssue:
+    """
+    Issue emitted by a rule-based check.
+    
+    Rules fully control their output, so they skip Pydantic validation on the
+    hot path; review_pr converts these to Issue when building ReviewOutput.
+    """
+    
+    type: str
+    severity: Literal["low", "medium", "high"]
+    message: str
+    confidence: float
+    action: Literal["review", "ignore"]
+    line_number: Optional[int] = None
+    file_path: Optional[str] = None
+
+
 class PRDiff(BaseModel):
     """Pull request diff input."""
     
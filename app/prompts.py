@@ -43,23 +43,28 @@ When uncertain, DO NOT include the issue. It's better to miss a minor issue than
 Return ONLY the JSON array, no markdown formatting."""
 
 
-def build_task_prompt(pr_diff: str, pr_title: str, pr_description: str) -> str:
-    """Build the task prompt for a specific PR."""
-    
-    prompt = f"""Review this Python pull request:
+# Task prompt skeleton, filled in with a single format_map call per PR
+_TASK_TMPL = """Review this Python pull request:
 
-TITLE: {pr_title}
+TITLE: {title}
 
 DESCRIPTION:
-{pr_description}
+{description}
 
 DIFF:
-{pr_diff}
+{diff}
 
 Return a JSON array of issues following the schema specified in the system prompt.
 If no issues found, return an empty array: []"""
-    
-    return prompt
+
+
+def build_task_prompt(pr_diff: str, pr_title: str, pr_description: str) -> str:
+    """Build the task prompt for a specific PR."""
+    return _TASK_TMPL.format_map({
+        "title": pr_title,
+        "description": pr_description,
+        "diff": pr_diff,
+    })
 
 
 # Prompt version for tracking/rollback
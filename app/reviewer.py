@@ -5,11 +5,17 @@ Orchestrates rule-based checks + optional LLM analysis.
 Handles failures gracefully - never blocks PRs.
 """
 
+import asyncio
+import atexit
+import inspect
 import os
-import json
+import threading
 import time
 import logging
-from typing import List, Optional
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import orjson
 from app.models import Issue, PRDiff, ReviewOutput, ReviewSummary
 from app.rules import run_all_rules
 from app.prompts import SYSTEM_PROMPT, build_task_prompt, PROMPT_VERSION
@@ -22,6 +28,92 @@ logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 CONFIDENCE_THRESHOLD = 0.7
 
 
+# LLM clients are costly to build (TLS context, connection pool), so they are
+# created on first use and reused. Async clients are tied to the event loop
+# they were created on, so the running loop is part of the cache key: reuse
+# only happens within one loop. The sync entry points (review_pr, call_llm)
+# therefore all run on one long-lived loop - see _run_sync.
+_llm_clients: Dict[tuple, Any] = {}
+# Loops on other threads (the sync loop, an app's own loop) share the cache
+_llm_clients_lock = threading.Lock()
+# Close tasks for clients dropped from the cache, kept alive until they finish
+_closing_tasks: set = set()
+
+
+async def _aclose_client(client: Any) -> None:
+    """Close a client's connection pool via whichever close API it has."""
+    close = getattr(client, "aclose", None) or getattr(client, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.debug(f"Error closing LLM client: {e}")
+
+
+def _get_llm_client(key: tuple, factory: Callable[[], Any]) -> Any:
+    """Return the cached client for key on the running loop, building it if needed."""
+    loop = asyncio.get_running_loop()
+    cache_key = (loop, *key)
+    with _llm_clients_lock:
+        client = _llm_clients.get(cache_key)
+        if client is not None:
+            return client
+        # Clients left behind by loops that have finished can't be closed on
+        # their own loop any more, so close them (best effort) on this one
+        stale = [_llm_clients.pop(k) for k in list(_llm_clients) if k[0].is_closed()]
+        client = factory()
+        _llm_clients[cache_key] = client
+    
+    for old in stale:
+        task = loop.create_task(_aclose_client(old))
+        _closing_tasks.add(task)
+        task.add_done_callback(_closing_tasks.discard)
+    return client
+
+
+async def aclose_llm_clients() -> None:
+    """
+    Close and forget the LLM clients cached for the running loop.
+    
+    Async applications driving review_pr_async on their own loop should
+    await this before that loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    with _llm_clients_lock:
+        clients = [_llm_clients.pop(k) for k in list(_llm_clients) if k[0] is loop]
+    for client in clients:
+        await _aclose_client(client)
+
+
+# The event loop shared by all sync callers, run forever in a daemon thread
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_loop_lock = threading.Lock()
+
+
+def _get_sync_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared sync-caller loop on first use."""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="reviewer-loop", daemon=True).start()
+            atexit.register(_shutdown_sync_loop, loop)
+            _sync_loop = loop
+        return _sync_loop
+
+
+def _shutdown_sync_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Close the shared loop's clients at interpreter exit, then stop it."""
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_llm_clients(), loop).result(timeout=5)
+    except Exception as e:
+        logger.debug(f"Error closing LLM clients at exit: {e}")
+    loop.call_soon_threadsafe(loop.stop)
+
+
 class ReviewerError(Exception):
     """Base exception for reviewer errors."""
     pass
@@ -37,9 +129,31 @@ class LLMInvalidOutputError(ReviewerError):
     pass
 
 
-def call_llm(pr_diff: PRDiff, provider: str = "openai", model: str = "gpt-4", timeout: int = 30) -> List[Issue]:
+def _run_sync(make_coro: Callable[[], Any], name: str) -> Any:
+    """
+    Run the coroutine built by make_coro to completion for a sync caller.
+    
+    Every sync call runs on the same long-lived loop, so LLM clients cached
+    by one call are reused by the next instead of being rebuilt per call.
+    
+    Blocking inside a running event loop (an async endpoint, Jupyter) would
+    stall that loop, so such callers get a clear error pointing at the async
+    variant. The coroutine is only created once that check has passed, so
+    nothing is left un-awaited.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run_coroutine_threadsafe(make_coro(), _get_sync_loop()).result()
+    raise RuntimeError(
+        f"{name}() cannot be called from a running event loop; "
+        f"use 'await {name}_async(...)' instead"
+    )
+
+
+async def call_llm_async(pr_diff: PRDiff, provider: str = "openai", model: str = "gpt-4", timeout: int = 30) -> List[Issue]:
     """
-    Call LLM for code review analysis.
+    Call LLM for code review analysis without blocking the event loop.
     
     Failure modes:
     - Timeout → raises LLMTimeoutError
@@ -52,11 +166,11 @@ def call_llm(pr_diff: PRDiff, provider: str = "openai", model: str = "gpt-4", ti
     
     try:
         if provider == "openai":
-            return _call_openai(task_prompt, model, timeout)
+            return await _call_openai(task_prompt, model, timeout)
         elif provider == "anthropic":
-            return _call_anthropic(task_prompt, model, timeout)
+            return await _call_anthropic(task_prompt, model, timeout)
         elif provider == "local":
-            return _call_local(task_prompt, model, timeout)
+            return await _call_local(task_prompt, model, timeout)
         else:
             raise ReviewerError(f"Unsupported LLM provider: {provider}")
     
@@ -67,18 +181,29 @@ def call_llm(pr_diff: PRDiff, provider: str = "openai", model: str = "gpt-4", ti
         raise ReviewerError(f"LLM call failed: {str(e)}")
 
 
-def _call_openai(task_prompt: str, model: str, timeout: int) -> List[Issue]:
+def call_llm(pr_diff: PRDiff, provider: str = "openai", model: str = "gpt-4", timeout: int = 30) -> List[Issue]:
+    """Synchronous wrapper around call_llm_async for non-async callers."""
+    return _run_sync(
+        lambda: call_llm_async(pr_diff, provider=provider, model=model, timeout=timeout),
+        "call_llm",
+    )
+
+
+async def _call_openai(task_prompt: str, model: str, timeout: int) -> List[Issue]:
     """Call OpenAI API."""
     try:
-        from openai import OpenAI
+        from openai import AsyncOpenAI
         
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ReviewerError("OPENAI_API_KEY not set")
         
-        client = OpenAI(api_key=api_key, timeout=timeout)
+        client = _get_llm_client(
+            ("openai", api_key, timeout),
+            lambda: AsyncOpenAI(api_key=api_key, timeout=timeout),
+        )
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -97,49 +222,7 @@ def _call_openai(task_prompt: str, model: str, timeout: int) -> List[Issue]:
         raise ReviewerError(f"OpenAI API error: {str(e)}")
 
 
-def _call_anthropic(task_prompt: str, model: str, timeout: int) -> List[Issue]:
-    """
-    Call Anthropic API via LangChain integration.
-
-    Why LangChain here:
-    - Unified interface: swapping to GPT-4 or a local model
-      later requires zero changes to this function's callers
-    - Built-in retry logic and timeout handling
-    - Provider-agnostic message format (HumanMessage/SystemMessage)
-    - Future-ready: adding tools, memory, or chains requires
-      no architectural changes
-    """
-    try:
-        from langchain_anthropic import ChatAnthropic
-        from langchain_core.messages import HumanMessage, SystemMessage
-
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise ReviewerError("ANTHROPIC_API_KEY not set")
-
-        llm = ChatAnthropic(
-            model=model,
-            api_key=api_key,
-            temperature=0.1,
-            max_tokens=2000,
-            timeout=timeout,
-        )
-
-        messages = [
-            SystemMessage(content=SYSTEM_PROMPT),
-            HumanMessage(content=task_prompt),
-        ]
-
-        response = llm.invoke(messages)
-        return _parse_llm_output(response.content)
-
-    except Exception as e:
-        raise ReviewerError(f"Anthropic (LangChain) error: {str(e)}")
-
-
-
-
-def _call_anthropic(task_prompt: str, model: str, timeout: int) -> List[Issue]:
+async def _call_anthropic(task_prompt: str, model: str, timeout: int) -> List[Issue]:
     """
     Call Anthropic API via LangChain integration.
 
@@ -159,12 +242,15 @@ def _call_anthropic(task_prompt: str, model: str, timeout: int) -> List[Issue]:
         if not api_key:
             raise ReviewerError("ANTHROPIC_API_KEY not set")
 
-        llm = ChatAnthropic(
-            model=model,
-            api_key=api_key,
-            temperature=0.1,
-            max_tokens=2000,
-            timeout=timeout,
+        llm = _get_llm_client(
+            ("anthropic", api_key, model, timeout),
+            lambda: ChatAnthropic(
+                model=model,
+                api_key=api_key,
+                temperature=0.1,
+                max_tokens=2000,
+                timeout=timeout,
+            ),
         )
 
         messages = [
@@ -172,25 +258,25 @@ def _call_anthropic(task_prompt: str, model: str, timeout: int) -> List[Issue]:
             HumanMessage(content=task_prompt),
         ]
 
-        response = llm.invoke(messages)
+        response = await llm.ainvoke(messages)
         return _parse_llm_output(response.content)
 
     except Exception as e:
         raise ReviewerError(f"Anthropic (LangChain) error: {str(e)}")
 
 
-
-
-
-
-def _call_local(task_prompt: str, model: str, timeout: int) -> List[Issue]:
+async def _call_local(task_prompt: str, model: str, timeout: int) -> List[Issue]:
     """Call local LLM server (e.g., Ollama, vLLM)."""
-    import requests
+    import httpx
     
     endpoint = os.getenv("LOCAL_LLM_ENDPOINT", "http://localhost:8000/v1/chat/completions")
     
     try:
-        response = requests.post(
+        client = _get_llm_client(
+            ("local", timeout),
+            lambda: httpx.AsyncClient(timeout=timeout),
+        )
+        response = await client.post(
             endpoint,
             json={
                 "model": model,
@@ -201,14 +287,14 @@ def _call_local(task_prompt: str, model: str, timeout: int) -> List[Issue]:
                 "temperature": 0.1,
                 "max_tokens": 2000,
             },
-            timeout=timeout
         )
         response.raise_for_status()
         
-        content = response.json()["choices"][0]["message"]["content"]
+        # Decode the raw body bytes directly, skipping the text decode step
+        content = orjson.loads(response.content)["choices"][0]["message"]["content"]
         return _parse_llm_output(content)
     
-    except requests.Timeout:
+    except httpx.TimeoutException:
         raise LLMTimeoutError("Local LLM timeout")
     except Exception as e:
         raise ReviewerError(f"Local LLM error: {str(e)}")
@@ -224,7 +310,7 @@ def _parse_llm_output(content: str) -> List[Issue]:
             if content.startswith("json"):
                 content = content[4:]
         
-        issues_data = json.loads(content)
+        issues_data = orjson.loads(content)
         
         if not isinstance(issues_data, list):
             raise LLMInvalidOutputError("LLM output is not a JSON array")
@@ -244,13 +330,36 @@ def _parse_llm_output(content: str) -> List[Issue]:
         
         return issues
     
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise LLMInvalidOutputError("LLM output is not valid JSON")
     except Exception as e:
         raise LLMInvalidOutputError(f"Failed to parse LLM output: {str(e)}")
 
 
-def review_pr(
+async def _run_llm_review(
+    pr_diff: PRDiff,
+    llm_provider: str,
+    llm_model: str,
+) -> Tuple[List[Issue], bool]:
+    """Run LLM analysis, degrading to ([], False) on any LLM failure."""
+    try:
+        llm_issues = await call_llm_async(pr_diff, provider=llm_provider, model=llm_model)
+        logger.info(f"LLM analysis completed: {len(llm_issues)} issues found")
+        return llm_issues, True
+    
+    except LLMTimeoutError:
+        logger.warning("LLM timeout - continuing with rule-based checks only")
+    
+    except LLMInvalidOutputError as e:
+        logger.warning(f"LLM invalid output - continuing with rule-based checks only: {e}")
+    
+    except ReviewerError as e:
+        logger.warning(f"LLM error - continuing with rule-based checks only: {e}")
+    
+    return [], False
+
+
+async def review_pr_async(
     pr_diff: PRDiff,
     use_llm: bool = True,
     llm_provider: str = "openai",
@@ -260,45 +369,41 @@ def review_pr(
     Review a pull request.
     
     Workflow:
-    1. Run rule-based checks (always)
-    2. Run LLM analysis (optional, graceful degradation on failure)
+    1. Run rule-based checks (always) in a worker thread
+    2. Run LLM analysis concurrently (optional, graceful degradation on failure)
     3. Combine and return results
     
+    The rule phase overlaps the network-bound LLM call, so end-to-end latency
+    is max(rules, LLM) rather than their sum.
+    
     Never fails - degrades gracefully to rule-based only.
     """
     start_time = time.time()
     
-    # Step 1: Rule-based checks (deterministic, always run)
-    rule_issues = run_all_rules(pr_diff.diff)
-    
-    # Step 2: LLM analysis (optional, may fail)
-    llm_issues = []
-    llm_used = False
-    model_name = None
+    # Step 1 + 2: Rule-based checks (deterministic, always run) alongside
+    # the optional LLM analysis (may fail)
+    rule_task = asyncio.to_thread(run_all_rules, pr_diff.diff)
     
     if use_llm:
-        try:
-            llm_issues = call_llm(pr_diff, provider=llm_provider, model=llm_model)
-            llm_used = True
-            model_name = llm_model
-            logger.info(f"LLM analysis completed: {len(llm_issues)} issues found")
-        
-        except LLMTimeoutError:
-            logger.warning("LLM timeout - continuing with rule-based checks only")
-        
-        except LLMInvalidOutputError as e:
-            logger.warning(f"LLM invalid output - continuing with rule-based checks only: {e}")
-        
-        except ReviewerError as e:
-            logger.warning(f"LLM error - continuing with rule-based checks only: {e}")
+        raw_rule_issues, (llm_issues, llm_used) = await asyncio.gather(
+            rule_task,
+            _run_llm_review(pr_diff, llm_provider, llm_model),
+        )
+    else:
+        raw_rule_issues = await rule_task
+        llm_issues, llm_used = [], False
+    
+    model_name = llm_model if llm_used else None
+    rule_issues = [
+        Issue.model_validate(issue, from_attributes=True)
+        for issue in raw_rule_issues
+    ]
     
     # Step 3: Combine results
     all_issues = rule_issues + llm_issues
     
     # Compute summary
-    severity_counts = {"low": 0, "medium": 0, "high": 0}
-    for issue in all_issues:
-        severity_counts[issue.severity] += 1
+    severity_counts = Counter(issue.severity for issue in all_issues)
     
     summary = ReviewSummary(
         total_issues=len(all_issues),
@@ -318,4 +423,55 @@ def review_pr(
             "prompt_version": PROMPT_VERSION,
             "llm_provider": llm_provider if llm_used else None,
         }
+    )
+
+
+async def review_prs_async(
+    pr_diffs: List[PRDiff],
+    use_llm: bool = True,
+    llm_provider: str = "openai",
+    llm_model: str = "gpt-4",
+    max_concurrency: int = 8,
+) -> List[ReviewOutput]:
+    """
+    Review many pull requests concurrently.
+    
+    LLM calls are network-bound, so a batch finishes in roughly one LLM
+    round-trip instead of one per PR. The semaphore bounds how many calls
+    are in flight at once to stay within provider rate limits.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def review_one(pr_diff: PRDiff) -> ReviewOutput:
+        async with semaphore:
+            return await review_pr_async(
+                pr_diff,
+                use_llm=use_llm,
+                llm_provider=llm_provider,
+                llm_model=llm_model,
+            )
+    
+    return list(await asyncio.gather(*(review_one(pr_diff) for pr_diff in pr_diffs)))
+
+
+def review_pr(
+    pr_diff: PRDiff,
+    use_llm: bool = True,
+    llm_provider: str = "openai",
+    llm_model: str = "gpt-4",
+) -> ReviewOutput:
+    """
+    Synchronous entry point (CLI); runs review_pr_async to completion.
+    
+    Raises RuntimeError when called from a running event loop - await
+    review_pr_async there instead.
+    """
+    return _run_sync(
+        lambda: review_pr_async(
+            pr_diff,
+            use_llm=use_llm,
+            llm_provider=llm_provider,
+            llm_model=llm_model,
+        ),
+        "review_pr",
     )
\ No newline at end of file
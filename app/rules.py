@@ -5,17 +5,147 @@ These are deterministic, fast, and don't cost API credits.
 Conservative by design - when in doubt, flag for human review.
 """
 
-import re
-from typing import List, Optional
-from app.models import Issue
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+from app.diff_scan import changed_lines, regex_rule_hits
+from app.models import RuleIssue
 
+try:
+    # RE2 compiles to an automaton with guaranteed linear-time matching;
+    # every pattern below sticks to the syntax both engines accept
+    import re2 as re
+except ImportError:
+    import re
 
-def check_pr_size(diff: str, threshold: int = 500) -> Optional[Issue]:
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+# Dangerous function patterns: (regex, message, severity).
+# Patterns are lowercase and run against the lowercased diff, which is
+# cheaper than matching the whole diff with re.IGNORECASE. Every repeat is
+# ended by a character it can't match (a quote, '=' or '('), so even the
+# backtracking engine stays linear on unterminated quotes or long whitespace
+# runs; values and alignment padding of any length are still matched.
+_SECURITY_RULES = (
+    (r'\beval\s*\(',                         "Use of eval() detected", "high"),
+    (r'\bexec\s*\(',                         "Use of exec() detected", "high"),
+    (r'\bpickle\.loads?\(',                  "Use of pickle detected - consider safer alternatives", "medium"),
+    (r'password\s*=\s*["\'][^"\']+["\']',    "Possible hardcoded password", "high"),
+    (r'api[_-]?key\s*=\s*["\'][^"\']+["\']', "Possible hardcoded API key", "high"),
+    (r'secret\s*=\s*["\'][^"\']+["\']',      "Possible hardcoded secret", "high"),
+    (r'secret_key\s*=\s*["\']',              "Hardcoded secret key detected", "high"),
+    (r'hashlib\.md5',                        "MD5 is cryptographically broken - use SHA256 or bcrypt", "high"),
+)
+
+
+# Regex sources as bytes: both engines scan the UTF-8 encoded added lines
+_SECURITY_PATTERNS = tuple(pattern.encode() for pattern, _, _ in _SECURITY_RULES)
+
+
+def _build_hyperscan_db():
+    """Compile all security rules into one Hyperscan database (None if unavailable)."""
+    if hyperscan is None:
+        return None
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=list(_SECURITY_PATTERNS),
+            ids=list(range(len(_SECURITY_RULES))),
+            elements=len(_SECURITY_RULES),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(_SECURITY_RULES),
+        )
+    except hyperscan.error:
+        return None
+    return db
+
+
+# When Hyperscan is installed, the rule set is scanned as a single SIMD
+# automaton; the database's scratch space is not thread-safe, hence the lock
+_SECURITY_HS_DB = _build_hyperscan_db()
+_SECURITY_HS_LOCK = threading.Lock()
+
+
+def _find_security_hits(text: str) -> Set[int]:
+    """Return the indexes of every security rule matching the (lowercased) text."""
+    data = text.encode()
+    if _SECURITY_HS_DB is None:
+        return regex_rule_hits(_SECURITY_PATTERNS, data)
+    
+    hits: Set[int] = set()
+    
+    def on_match(rule_id, start, end, flags, context):
+        hits.add(rule_id)
+    
+    with _SECURITY_HS_LOCK:
+        _SECURITY_HS_DB.scan(data, match_event_handler=on_match)
+    return hits
+
+
+_STAR_IMPORT_RX = re.compile(r'from\s+\S+\s+import\s+\*')
+
+
+@dataclass
+class DiffStats:
+    """Everything the rules need from a diff, collected in one pass."""
+    
+    added_count: int = 0
+    removed_count: int = 0
+    def_adds: int = 0
+    star_import: bool = False
+    security_hits: Set[int] = field(default_factory=set)
+    
+    @property
+    def lines_changed(self) -> int:
+        return self.added_count + self.removed_count
+
+
+def _is_def_line(line: str) -> bool:
+    """Match an added function definition without going through the regex engine."""
+    code = line[1:].lstrip()
+    return code.startswith("def") and code[3:4].isspace() and "(" in code
+
+
+def _scan_diff(diff: str) -> DiffStats:
+    """Split and classify the diff once so individual rules don't re-scan it."""
+    stats = DiffStats()
+    added_code = []
+    append = added_code.append
+    removed_count = 0
+    def_adds = 0
+    
+    for line in changed_lines(diff):
+        if line.startswith('+'):
+            append(line[1:])
+            if _is_def_line(line):
+                def_adds += 1
+        else:
+            removed_count += 1
+    
+    stats.added_count = len(added_code)
+    stats.removed_count = removed_count
+    stats.def_adds = def_adds
+    
+    # Only added code can introduce new issues, so the pattern-based rules
+    # scan the added lines alone rather than context and removed lines too
+    added_text = "\n".join(added_code)
+    # Cheap substring gate before the star-import regex
+    stats.star_import = "import" in added_text and "*" in added_text and bool(_STAR_IMPORT_RX.search(added_text))
+    stats.security_hits = _find_security_hits(added_text.lower())
+    return stats
+
+
+def check_pr_size(diff: str, threshold: int = 500, stats: Optional[DiffStats] = None) -> Optional[RuleIssue]:
     """Flag large PRs that should consider being split."""
-    lines_changed = len([line for line in diff.split('\n') if line.startswith(('+', '-')) and not line.startswith(('+++', '---'))])
+    if stats is None:
+        stats = _scan_diff(diff)
+    lines_changed = stats.lines_changed
     
     if lines_changed > threshold:
-        return Issue(
+        return RuleIssue(
             type="pr_size",
             severity="medium",
             message=f"PR has {lines_changed} lines changed. Consider splitting for easier review.",
@@ -25,42 +155,35 @@ def check_pr_size(diff: str, threshold: int = 500) -> Optional[Issue]:
     return None
 
 
-def check_security_patterns(diff: str) -> List[Issue]:
+def check_security_patterns(diff: str, stats: Optional[DiffStats] = None) -> List[RuleIssue]:
     """Detect common security anti-patterns."""
+    if stats is None:
+        stats = _scan_diff(diff)
     issues = []
     
-    # Dangerous function patterns
-    dangerous_patterns = {
-    r'\beval\s*\(':                          ("Use of eval() detected", "high"),
-    r'\bexec\s*\(':                          ("Use of exec() detected", "high"),
-    r'\bpickle\.loads?\(':                   ("Use of pickle detected - consider safer alternatives", "medium"),
-    r'password\s*=\s*["\'][^"\']+["\']':     ("Possible hardcoded password", "high"),
-    r'api[_-]?key\s*=\s*["\'][^"\']+["\']': ("Possible hardcoded API key", "high"),
-    r'secret\s*=\s*["\'][^"\']+["\']':       ("Possible hardcoded secret", "high"),
-    r'SECRET_KEY\s*=\s*["\']':               ("Hardcoded secret key detected", "high"),
-    r'hashlib\.md5':                         ("MD5 is cryptographically broken - use SHA256 or bcrypt", "high"),
-}
-    
-    for pattern, (message, severity) in dangerous_patterns.items():
-        if re.search(pattern, diff, re.IGNORECASE):
-            issues.append(Issue(
-                type="security",
-                severity=severity,
-                message=message,
-                confidence=1.0,
-                action="review"
-            ))
+    # One issue per rule, reported in rule order regardless of match position
+    for index in sorted(stats.security_hits):
+        _, message, severity = _SECURITY_RULES[index]
+        issues.append(RuleIssue(
+            type="security",
+            severity=severity,
+            message=message,
+            confidence=1.0,
+            action="review"
+        ))
     
     return issues
 
 
-def check_import_quality(diff: str) -> List[Issue]:
+def check_import_quality(diff: str, stats: Optional[DiffStats] = None) -> List[RuleIssue]:
     """Check for import-related issues."""
+    if stats is None:
+        stats = _scan_diff(diff)
     issues = []
     
     # Star imports (import *)
-    if re.search(r'from\s+\S+\s+import\s+\*', diff):
-        issues.append(Issue(
+    if stats.star_import:
+        issues.append(RuleIssue(
             type="style",
             severity="low",
             message="Star import (import *) detected. Consider explicit imports.",
@@ -71,21 +194,18 @@ def check_import_quality(diff: str) -> List[Issue]:
     return issues
 
 
-def check_code_complexity(diff: str) -> List[Issue]:
+def check_code_complexity(diff: str, stats: Optional[DiffStats] = None) -> List[RuleIssue]:
     """Flag overly complex additions."""
+    if stats is None:
+        stats = _scan_diff(diff)
     issues = []
     
     # Very long functions (>100 lines added in a single function)
     # This is a simplified heuristic
-    added_lines = [line for line in diff.split('\n') if line.startswith('+') and not line.startswith('+++')]
-    
-    if len(added_lines) > 100:
+    if stats.added_count > 100:
         # Check if it's mostly in one function
-        function_pattern = r'^\+\s*def\s+\w+\s*\('
-        function_count = sum(1 for line in added_lines if re.match(function_pattern, line))
-        
-        if function_count == 1:
-            issues.append(Issue(
+        if stats.def_adds == 1:
+            issues.append(RuleIssue(
                 type="complexity",
                 severity="medium",
                 message="Large function detected (>100 lines). Consider breaking into smaller functions.",
@@ -96,7 +216,8 @@ def check_code_complexity(diff: str) -> List[Issue]:
     return issues
 
 
-# Registry of all rule-based checks
+# Registry of all rule-based checks.
+# Each rule takes the raw diff plus the shared DiffStats for that diff.
 RULE_REGISTRY = [
     check_pr_size,
     check_security_patterns,
@@ -105,16 +226,17 @@ RULE_REGISTRY = [
 ]
 
 
-def run_all_rules(diff: str) -> List[Issue]:
-    """Run all registered rule-based checks."""
+def run_all_rules(diff: str) -> List[RuleIssue]:
+    """Run all registered rule-based checks over a single scan of the diff."""
     issues = []
+    stats = _scan_diff(diff)
     
     for rule_func in RULE_REGISTRY:
-        result = rule_func(diff)
+        result = rule_func(diff, stats=stats)
         if result:
             if isinstance(result, list):
                 issues.extend(result)
             else:
                 issues.append(result)
     
-    return issues
\ No newline at end of file
+    return issues
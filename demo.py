@@ -6,89 +6,329 @@ Usage: python demo.py
 """
 
 import json
-import re
-from typing import List, Dict, Optional
+import sys
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
 
+from app.diff_scan import changed_lines, diff_fingerprint, regex_rule_hits
 
-def check_pr_size(diff: str, threshold: int = 500) -> Optional[Dict]:
-    """Flag large PRs."""
-    lines_changed = len([line for line in diff.split('\n') 
-                        if line.startswith(('+', '-')) and not line.startswith(('+++', '---'))])
+# Optional accelerators - the demo still runs on the standard library alone
+try:
+    import hyperscan  # multi-pattern SIMD scanner
+except ImportError:
+    hyperscan = None
+
+try:
+    import orjson  # C JSON encoder that writes bytes directly
+except ImportError:
+    orjson = None
+
+
+def _count_changed_lines(diff: bytes, limit: Optional[int] = None) -> Tuple[int, bool]:
+    """
+    Count the diff's +/- lines, using the same hunk-aware walk as the checks.
     
+    With a limit, counting stops at the first line past it. Returns
+    (count, truncated); a truncated count is a lower bound.
+    """
+    count = 0
+    for _ in changed_lines(diff):
+        count += 1
+        if limit is not None and count > limit:
+            return count, True
+    return count, False
+
+
+def check_pr_size(diff: bytes, threshold: int = 500) -> Optional[Dict]:
+    """Flag large PRs."""
+    # Count exactly up to the huge-PR limit, as run_all_rules does
+    limit = _HUGE_PR_FACTOR * threshold
+    lines_changed, truncated = _count_changed_lines(diff, limit=limit)
+    return _pr_size_issue(lines_changed, truncated, threshold, limit=limit)
+
+
+def _pr_size_issue(lines_changed: int, truncated: bool, threshold: int, limit: int) -> Optional[Dict]:
+    """Size issue for a count from _count_changed_lines(diff, limit), if over threshold."""
     if lines_changed > threshold:
+        changed = f">{limit}" if truncated else str(lines_changed)
         return {
             "type": "pr_size",
             "severity": "medium",
-            "message": f"PR has {lines_changed} lines changed. Consider splitting for easier review.",
+            "message": f"PR has {changed} lines changed. Consider splitting for easier review.",
             "confidence": 1.0,
             "action": "review"
         }
     return None
 
+# (pattern, message, severity), in reporting order; rules are referred to by
+# index everywhere, written to the same linear-time constraints as
+# app.rules._SECURITY_RULES. Patterns are bytes: the diff is encoded once in
+# run_review and scanned one byte per character.
+_SECURITY_RULES: Tuple[Tuple[bytes, str, str], ...] = (
+    (rb'\beval\s*\(',                         "Use of eval() detected - security risk", "high"),
+    (rb'\bexec\s*\(',                         "Use of exec() detected - security risk", "high"),
+    (rb'password\s*=\s*["\'][^"\']+["\']',    "Possible hardcoded password", "high"),
+    (rb'api[_-]?key\s*=\s*["\'][^"\']+["\']', "Possible hardcoded API key", "high"),
+    (rb'SECRET_KEY\s*=\s*["\']',              "Hardcoded secret key detected", "high"),
+    (rb'hashlib\.md5',                        "MD5 is cryptographically broken - use SHA256 or bcrypt", "high"),
+)
 
-def check_security_patterns(diff: str) -> List[Dict]:
-    """Detect security anti-patterns."""
-    issues = []
+# The star-import check (case-sensitive, unlike the security rules) runs in
+# the same scan, as the rule after the last security rule
+_STAR_IMPORT_PATTERN = rb'from\s+\S+\s+import\s+\*'
+_STAR_IMPORT_RULE = len(_SECURITY_RULES)
+_RULE_COUNT = _STAR_IMPORT_RULE + 1
+
+# Regex source per rule index; the scoped (?i:...) flag works with both re
+# and re2 (which has no IGNORECASE constant)
+_RULE_SOURCES = tuple(b"(?i:" + pattern + b")" for pattern, _, _ in _SECURITY_RULES) + (_STAR_IMPORT_PATTERN,)
+
+
+def _build_hyperscan_db(single_match: bool = True):
+    """Compile the rule set into one Hyperscan database, or None if unavailable."""
+    if hyperscan is None:
+        return None
+    extra = hyperscan.HS_FLAG_SINGLEMATCH if single_match else 0
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[pattern for pattern, _, _ in _SECURITY_RULES] + [_STAR_IMPORT_PATTERN],
+            ids=list(range(_RULE_COUNT)),
+            elements=_RULE_COUNT,
+            flags=[hyperscan.HS_FLAG_CASELESS | extra] * len(_SECURITY_RULES) + [extra],
+        )
+    except hyperscan.error:
+        return None
+    return db
+
+
+_RULES_HS_DB = _build_hyperscan_db()
+# Batch scans need every match, not just the first per rule, so that hits
+# can be attributed to each diff in the batch
+_RULES_HS_BATCH_DB = _build_hyperscan_db(single_match=False)
+
+
+def _find_rule_hits(text: bytes) -> Set[int]:
+    """Indexes of all rules matching the text, via Hyperscan or regex."""
+    if _RULES_HS_DB is None:
+        return regex_rule_hits(_RULE_SOURCES, text)
     
-    dangerous_patterns = {
-        r'\beval\s*\(': ("Use of eval() detected - security risk", "high"),
-        r'\bexec\s*\(': ("Use of exec() detected - security risk", "high"),
-        r'password\s*=\s*["\'][^"\']+["\']': ("Possible hardcoded password", "high"),
-        r'api[_-]?key\s*=\s*["\'][^"\']+["\']': ("Possible hardcoded API key", "high"),
-        r'SECRET_KEY\s*=\s*["\']': ("Hardcoded secret key detected", "high"),
-        r'hashlib\.md5': ("MD5 is cryptographically broken - use SHA256 or bcrypt", "high"),
-    }
+    hits = set()
     
-    for pattern, (message, severity) in dangerous_patterns.items():
-        if re.search(pattern, diff, re.IGNORECASE):
-            issues.append({
-                "type": "security",
-                "severity": severity,
-                "message": message,
-                "confidence": 1.0,
-                "action": "review"
-            })
+    def on_match(rule_id, start, end, flags, context):
+        hits.add(rule_id)
     
-    return issues
+    _RULES_HS_DB.scan(text, match_event_handler=on_match)
+    return hits
 
 
-def check_import_quality(diff: str) -> List[Dict]:
-    """Check imports."""
-    issues = []
+# Joins texts for a batch scan. Security matches can only run past the end
+# of a text through whitespace or an unquoted run, and both stop at a quote;
+# a star import can cross at most one non-whitespace run between "from" and
+# "import", and the separator holds two. So no match starts in one text and
+# ends in the next, and matches ending inside the separator are discarded.
+_BATCH_SEPARATOR = b"\n'\"\n'\"\n"
+
+
+def _find_rule_hits_batch(texts: List[bytes]) -> List[Set[int]]:
+    """Rule indexes matching each text, from one Hyperscan scan over all of them."""
+    starts, ends = [], []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text)
+        ends.append(offset)
+        offset += len(_BATCH_SEPARATOR)
     
-    if re.search(r'from\s+\S+\s+import\s+\*', diff):
-        issues.append({
-            "type": "style",
-            "severity": "low",
-            "message": "Star import (import *) detected. Consider explicit imports.",
-            "confidence": 0.9,
-            "action": "review"
-        })
+    hits = [set() for _ in texts]
     
-    return issues
+    def on_match(rule_id, start, end, flags, context):
+        # First text ending at or after the match end; rejected if the match
+        # actually ended in the separator before that text
+        index = bisect_left(ends, end)
+        if index < len(ends) and end > starts[index]:
+            hits[index].add(rule_id)
+    
+    _RULES_HS_BATCH_DB.scan(_BATCH_SEPARATOR.join(texts), match_event_handler=on_match)
+    return hits
+
+# Every security rule needs one of these literals; clean diffs are rejected
+# by fast substring searches before the regex engine runs at all
+_SECURITY_TOKENS = (b"eval", b"exec", b"password", b"api", b"secret", b"md5")
+
+
+def _may_match(diff: bytes) -> bool:
+    """Cheap substring screen: False means no rule can match the diff."""
+    if b"import" in diff and b"*" in diff:
+        return True
+    lowered = diff.lower()
+    return any(token in lowered for token in _SECURITY_TOKENS)
+
+
+# Issue dicts are built once, parallel to the rule indexes; checks append
+# shallow copies so callers may mutate their results
+_ISSUE_TEMPLATES = tuple(
+    {
+        "type": "security",
+        "severity": severity,
+        "message": message,
+        "confidence": 1.0,
+        "action": "review"
+    }
+    for _, message, severity in _SECURITY_RULES
+) + ({
+    "type": "style",
+    "severity": "low",
+    "message": "Star import (import *) detected. Consider explicit imports.",
+    "confidence": 0.9,
+    "action": "review"
+},)
+
+
+def _added_lines(diff: bytes) -> bytes:
+    """Added lines of the diff (without their '+'), newline-joined."""
+    return b"\n".join(line[1:] for line in changed_lines(diff) if line.startswith(b"+"))
+
+
+def _scan_rules(diff: bytes) -> Set[int]:
+    """Indexes of every security and import rule matching the diff's added lines."""
+    if not _may_match(diff):
+        return set()
+    # Only added code can introduce new issues, so removed and context lines
+    # are left out of the scan
+    return _find_rule_hits(_added_lines(diff))
+
+
+def _rule_issues(hits: Set[int]) -> List[Dict]:
+    """One issue per matched rule, in rule order."""
+    return [_ISSUE_TEMPLATES[index].copy() for index in sorted(hits)]
+
+
+def check_security_patterns(diff: bytes) -> List[Dict]:
+    """Detect security anti-patterns."""
+    return _rule_issues(_scan_rules(diff) - {_STAR_IMPORT_RULE})
+
+
+def check_import_quality(diff: bytes) -> List[Dict]:
+    """Check imports."""
+    return _rule_issues(_scan_rules(diff) & {_STAR_IMPORT_RULE})
+
+
+# Rule results depend only on the diff, so re-reviews of an identical diff
+# (force-pushes, CI retries) are served from an LRU keyed by its diff_fingerprint
+_REVIEW_CACHE_SIZE = 1024
+_review_cache: "OrderedDict[str, List[Dict]]" = OrderedDict()
+
+
+def _diff_bytes(pr_data: Dict) -> bytes:
+    """The PR diff as UTF-8 bytes; every rule works on bytes."""
+    diff = pr_data["diff"]
+    if isinstance(diff, str):
+        diff = diff.encode("utf-8", "replace")
+    return diff
+
+
+def _cache_get(key: str) -> Optional[List[Dict]]:
+    """Copy of the cached issues for a diff fingerprint, or None."""
+    cached = _review_cache.get(key)
+    if cached is None:
+        return None
+    _review_cache.move_to_end(key)
+    return [dict(issue) for issue in cached]
+
+
+def _cache_put(key: str, issues: List[Dict]):
+    """Store a copy of the issues, evicting the least recently used entry."""
+    _review_cache[key] = [dict(issue) for issue in issues]
+    if len(_review_cache) > _REVIEW_CACHE_SIZE:
+        _review_cache.popitem(last=False)
 
 
 def run_review(pr_data: Dict) -> Dict:
     """Run code review."""
-    diff = pr_data["diff"]
+    # Encode once; every rule below works on the UTF-8 bytes
+    diff = _diff_bytes(pr_data)
+    key = diff_fingerprint(diff)
     
-    # Run all checks
-    issues = []
+    issues = _cache_get(key)
+    if issues is None:
+        issues = run_all_rules(diff)
+        _cache_put(key, issues)
     
-    size_issue = check_pr_size(diff)
-    if size_issue:
-        issues.append(size_issue)
+    return _build_result(pr_data["pr_number"], issues)
+
+
+# PRs handed to a worker process at a time by run_reviews
+_REVIEW_CHUNK = 16
+
+
+def run_reviews(pr_list: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
+    """
+    Review many PRs, returning results in input order.
+    
+    Batches larger than one chunk are fanned out to a process pool (rule
+    checks are CPU-bound, so threads would contend for the GIL); each worker
+    keeps its own review cache. Pass max_workers=1 to stay in-process.
+    """
+    if max_workers == 1 or len(pr_list) <= _REVIEW_CHUNK:
+        return _run_reviews_batch(pr_list)
+    
+    chunks = [pr_list[i:i + _REVIEW_CHUNK] for i in range(0, len(pr_list), _REVIEW_CHUNK)]
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_results in executor.map(_run_reviews_batch, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+def _run_reviews_batch(pr_list: List[Dict]) -> List[Dict]:
+    """
+    Review PRs in this process.
     
-    issues.extend(check_security_patterns(diff))
-    issues.extend(check_import_quality(diff))
+    With Hyperscan installed, the pattern rules for every uncached diff run
+    as a single scan over the concatenated added lines instead of one scan
+    per PR.
+    """
+    if _RULES_HS_BATCH_DB is None:
+        return [run_review(pr_data) for pr_data in pr_list]
     
+    diffs = [_diff_bytes(pr_data) for pr_data in pr_list]
+    keys = [diff_fingerprint(diff) for diff in diffs]
+    issue_lists = [_cache_get(key) for key in keys]
+    
+    # Huge PRs only get their size issues, and diffs failing the substring
+    # screen have no pattern issues; neither goes into the batch scan
+    scan = []
+    for i, issues in enumerate(issue_lists):
+        if issues is None:
+            issues, huge = _size_checks(diffs[i])
+            issue_lists[i] = issues
+            if huge or not _may_match(diffs[i]):
+                _cache_put(keys[i], issues)
+            else:
+                scan.append(i)
+    
+    if scan:
+        batch_hits = _find_rule_hits_batch([_added_lines(diffs[i]) for i in scan])
+        for i, hits in zip(scan, batch_hits):
+            issue_lists[i].extend(_content_checks(diffs[i], hits=hits))
+            _cache_put(keys[i], issue_lists[i])
+    
+    return [
+        _build_result(pr_data["pr_number"], issues)
+        for pr_data, issues in zip(pr_list, issue_lists)
+    ]
+
+
+def _build_result(pr_number: int, issues: List[Dict]) -> Dict:
+    """Assemble the review result with its severity summary."""
     # Calculate summary
-    severity_counts = {"low": 0, "medium": 0, "high": 0}
-    for issue in issues:
-        severity_counts[issue["severity"]] += 1
+    severity_counts = Counter(issue["severity"] for issue in issues)
     
     return {
-        "pr_number": pr_data["pr_number"],
+        "pr_number": pr_number,
         "issues": issues,
         "summary": {
             "total_issues": len(issues),
@@ -99,32 +339,91 @@ def run_review(pr_data: Dict) -> Dict:
     }
 
 
+_PR_SIZE_THRESHOLD = 500
+# PRs this many times over the size threshold only get the size warning:
+# the advice is already to split them, and pattern-scanning megabytes of
+# generated or vendored diff adds little
+_HUGE_PR_FACTOR = 10
+
+
+def run_all_rules(diff: bytes) -> List[Dict]:
+    """
+    Run all checks against a diff.
+    
+    The size count stops early on huge PRs; the security and import rules
+    then share a single scan of the added lines.
+    """
+    issues, huge = _size_checks(diff)
+    if not huge:
+        issues.extend(_content_checks(diff))
+    return issues
+
+
+def _size_checks(diff: bytes) -> Tuple[List[Dict], bool]:
+    """Size issues for a diff, and whether it is too large for the content checks."""
+    issues = []
+    huge_limit = _HUGE_PR_FACTOR * _PR_SIZE_THRESHOLD
+    lines_changed, truncated = _count_changed_lines(diff, limit=huge_limit)
+    
+    size_issue = _pr_size_issue(lines_changed, truncated, _PR_SIZE_THRESHOLD, limit=huge_limit)
+    if size_issue:
+        issues.append(size_issue)
+    
+    if lines_changed > huge_limit:
+        issues.append({
+            "type": "pr_size",
+            "severity": "low",
+            "message": f"PR exceeds {huge_limit} changed lines; security and import checks were skipped. Split it for a full review.",
+            "confidence": 1.0,
+            "action": "review"
+        })
+        return issues, True
+    
+    return issues, False
+
+
+def _content_checks(diff: bytes, hits: Optional[Set[int]] = None) -> List[Dict]:
+    """Security and import checks (rule hits may come from a batch scan)."""
+    if hits is None:
+        hits = _scan_rules(diff)
+    return _rule_issues(hits)
+
+
+_SEVERITY_ICONS = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+
+
 def print_review(result: Dict):
     """Print review results."""
-    print("\n" + "="*70)
-    print(f"CODE REVIEW SUMMARY - PR #{result['pr_number']}")
-    print("="*70)
-    
+    # Assemble the whole report and write it once rather than per line
     summary = result["summary"]
-    print(f"\nTotal Issues: {summary['total_issues']}")
-    print(f"  High Severity:   {summary['high_severity']}")
-    print(f"  Medium Severity: {summary['medium_severity']}")
-    print(f"  Low Severity:    {summary['low_severity']}")
+    parts = [
+        "",
+        "=" * 70,
+        f"CODE REVIEW SUMMARY - PR #{result['pr_number']}",
+        "=" * 70,
+        "",
+        f"Total Issues: {summary['total_issues']}",
+        f"  High Severity:   {summary['high_severity']}",
+        f"  Medium Severity: {summary['medium_severity']}",
+        f"  Low Severity:    {summary['low_severity']}",
+    ]
     
     if result["issues"]:
-        print("\n" + "-"*70)
-        print("ISSUES FOUND:")
-        print("-"*70)
+        parts += ["", "-" * 70, "ISSUES FOUND:", "-" * 70]
         
         for i, issue in enumerate(result["issues"], 1):
-            severity_icon = "🔴" if issue["severity"] == "high" else "🟡" if issue["severity"] == "medium" else "🟢"
-            print(f"\n{i}. {severity_icon} [{issue['severity'].upper()}] {issue['type'].upper()}")
-            print(f"   {issue['message']}")
-            print(f"   Confidence: {issue['confidence']:.1%}")
+            severity_icon = _SEVERITY_ICONS.get(issue["severity"], "🟢")
+            parts += [
+                "",
+                f"{i}. {severity_icon} [{issue['severity'].upper()}] {issue['type'].upper()}",
+                f"   {issue['message']}",
+                f"   Confidence: {issue['confidence']:.1%}",
+            ]
     else:
-        print("\n✅ No issues found!")
+        parts += ["", "✅ No issues found!"]
     
-    print("\n" + "="*70 + "\n")
+    parts += ["", "=" * 70, "", ""]
+    sys.stdout.write("\n".join(parts))
 
 
 if __name__ == "__main__":
@@ -145,7 +444,11 @@ if __name__ == "__main__":
     # Save output
     import os
     os.makedirs("output", exist_ok=True)
-    with open("output/demo_results.json", "w") as f:
-        json.dump(result, f, indent=2)
+    if orjson is not None:
+        with open("output/demo_results.json", "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        with open("output/demo_results.json", "w") as f:
+            json.dump(result, f, indent=2)
     
     print("✓ Results saved to: output/demo_results.json\n")
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Shared test fixtures.
+"""
+
+import importlib.util
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def load_without(monkeypatch):
+    """
+    Load a fresh copy of a module with some optional packages unimportable.
+    
+    Used to run the rule checks on every engine (Hyperscan, RE2, stdlib re),
+    not just whichever happens to be installed.
+    """
+    def load(module_name: str, *blocked: str):
+        for name in blocked:
+            monkeypatch.setitem(sys.modules, name, None)
+        spec = importlib.util.find_spec(module_name)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    
+    return load
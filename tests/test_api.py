@@ -0,0 +1,76 @@
+"""
+Tests for the FastAPI wrapper's inline rule checks and endpoints.
+
+Run with: pytest tests/
+"""
+
+from collections import OrderedDict
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from api import app, cached_review
+
+client = TestClient(app)
+
+
+def _request(pr_number: int, diff: str) -> dict:
+    return {"pr_number": pr_number, "title": f"PR {pr_number}", "diff": diff}
+
+
+@pytest.mark.parametrize("diff, expected", [
+    ('+password = "eval(x)"', {"Use of eval() detected - security risk", "Possible hardcoded password"}),
+    ('+api_key = "exec(x)"', {"Use of exec() detected - security risk", "Possible hardcoded API key"}),
+    ("+blob = PICKLE.LOADS(b)\n-eval(x)", {"pickle.load() is unsafe - use safer alternatives"}),
+    ('+password = "' + "A" * 300 + '"', {"Possible hardcoded password"}),
+    ('+API_KEY            = "abc123"', {"Possible hardcoded API key"}),
+])
+def test_security_patterns(diff, expected):
+    """Each matching rule is reported once, including overlapping matches."""
+    assert {issue["message"] for issue in api.check_security_patterns(diff)} == expected
+
+
+def test_review_batch_preserves_order():
+    """Batch results come back one per request, in request order."""
+    response = client.post("/review/batch", json=[
+        _request(7, "+result = eval(x)"),
+        _request(3, "+a = 1"),
+        _request(5, "+from utils import *"),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["pr_number"] for item in body] == [7, 3, 5]
+    assert [item["summary"]["total_issues"] for item in body] == [1, 0, 1]
+    assert body[0]["issues"][0]["type"] == "security"
+    assert body[2]["issues"][0]["type"] == "style"
+
+
+def test_review_batch_empty_diff_names_the_item():
+    """An empty diff rejects the whole batch and says which item it was."""
+    response = client.post("/review/batch", json=[_request(1, "+a = 1"), _request(2, "")])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "diff is required (item 1)"
+
+
+def test_review_batch_empty_list():
+    """An empty batch is a valid request with an empty result."""
+    response = client.post("/review/batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_cached_review_hit_and_eviction(monkeypatch):
+    """Repeated diffs are served from the LRU; the least recently used entry goes first."""
+    monkeypatch.setattr(api, "_review_cache", OrderedDict())
+    monkeypatch.setattr(api, "_REVIEW_CACHE_SIZE", 2)
+    
+    first = cached_review("+a = 1")
+    assert cached_review("+a = 1") is first
+    second = cached_review("+b = 2")
+    cached_review("+a = 1")  # now most recently used
+    cached_review("+c = 3")  # evicts "+b = 2"
+    
+    assert len(api._review_cache) == 2
+    assert cached_review("+a = 1") is first
+    assert cached_review("+b = 2") is not second
@@ -0,0 +1,98 @@
+"""
+Tests for the standalone demo's rule pipeline.
+
+Run with: pytest tests/
+"""
+
+import pytest
+import demo
+
+
+def test_size_and_rules_share_the_hunk_walk():
+    """'--- '/'+++ ' lines inside a hunk count as changed lines and are scanned."""
+    hunk = b"@@ -1,2 +1,2 @@\n--- old comment\n+++ eval(p)\n y = 2"
+    assert demo._count_changed_lines(hunk) == (2, False)
+    assert demo.check_pr_size(hunk, threshold=1) is not None
+    assert demo.check_pr_size(hunk, threshold=2) is None
+    assert demo.check_security_patterns(hunk)
+
+
+@pytest.mark.parametrize("blocked", [(), ("hyperscan",)], ids=["default", "no-hyperscan"])
+@pytest.mark.parametrize("diff, expected", [
+    (b'+password = "eval(x)"', {"Use of eval() detected - security risk", "Possible hardcoded password"}),
+    (b'+API_KEY = "exec(y)"\n+from os import *', {
+        "Use of exec() detected - security risk", "Possible hardcoded API key",
+        "Star import (import *) detected. Consider explicit imports.",
+    }),
+    (b"+FROM os IMPORT *", set()),
+    (b'+password = "' + b"A" * 300 + b'"', {"Possible hardcoded password"}),
+    (b'+API_KEY            = "abc123"', {"Possible hardcoded API key"}),
+])
+def test_rules_same_hits_with_and_without_hyperscan(load_without, blocked, diff, expected):
+    """Hyperscan and the regex fallback report the same issues, including overlaps."""
+    module = load_without("demo", *blocked)
+    if blocked:
+        assert module._RULES_HS_DB is None
+    assert {issue["message"] for issue in module._content_checks(diff)} == expected
+
+
+# Each diff ends where a match could run on into the next text of a batch
+_BATCH_DIFFS = [
+    b'+password = "',
+    b'+abc" and eval(x)',
+    b"+from x",
+    b"+import *",
+    b"+SECRET_KEY =",
+    b'+"abc"',
+    b'+API_KEY = "k"\n+from os import *',
+    b"+clean = 1",
+    b"+x = 1\n" * 6000 + b"+eval(x)",
+]
+
+
+def _prs(diffs):
+    return [{"pr_number": i, "diff": diff} for i, diff in enumerate(diffs)]
+
+
+@pytest.mark.parametrize("blocked", [(), ("hyperscan",)], ids=["default", "no-hyperscan"])
+def test_batch_review_matches_single_reviews(load_without, monkeypatch, blocked):
+    """Batched scans report exactly what one review per PR does."""
+    module = load_without("demo", *blocked)
+    prs = _prs(_BATCH_DIFFS)
+    expected = [module.run_review(pr) for pr in prs]
+    monkeypatch.setattr(module, "_review_cache", type(module._review_cache)())
+    assert module._run_reviews_batch(prs) == expected
+
+
+def test_run_reviews_process_pool_keeps_order():
+    """Batches over one chunk go through the process pool, in input order."""
+    prs = _prs(_BATCH_DIFFS * 4)
+    assert len(prs) > demo._REVIEW_CHUNK
+    results = demo.run_reviews(prs, max_workers=2)
+    assert [r["pr_number"] for r in results] == list(range(len(prs)))
+    assert results == [demo.run_review(pr) for pr in prs]
+
+
+def test_count_changed_lines_truncates_past_limit():
+    """Counting stops early past the limit and reports a lower bound."""
+    diff = b"--- a/x.py\n+++ b/x.py\n" + b"+x\n-y\n" * 100000
+    assert demo._count_changed_lines(diff) == (200000, False)
+    count, truncated = demo._count_changed_lines(diff, limit=500)
+    assert truncated and 500 < count < 200000
+
+
+def test_pr_size_message_for_truncated_count():
+    """A truncated count is reported as '>N', an exact one as the number."""
+    big = demo.check_pr_size(b"+x\n" * 100000)
+    assert big["message"].startswith("PR has >5000 lines changed.")
+    exact = demo.check_pr_size(b"+x\n" * 600)
+    assert exact["message"].startswith("PR has 600 lines changed.")
+    assert demo.check_pr_size(b"+x\n" * 500) is None
+
+
+def test_huge_pr_skips_content_checks():
+    """PRs far over the size threshold only get the size issues."""
+    issues = demo.run_all_rules(b"+x = 1\n" * 6000 + b"+eval(x)")
+    assert [issue["type"] for issue in issues] == ["pr_size", "pr_size"]
+    assert "checks were skipped" in issues[1]["message"]
+    assert demo.run_all_rules(b"+eval(x)")[0]["type"] == "security"
@@ -0,0 +1,101 @@
+"""
+Tests for the diff scanning helpers shared by the rules, the API and the demo.
+
+Run with: pytest tests/
+"""
+
+import pytest
+from app.diff_scan import changed_lines, diff_fingerprint, regex_rule_hits
+
+
+def _changed(diff: str, as_bytes: bool):
+    """changed_lines() on a str or bytes diff, returned as str for comparison."""
+    if as_bytes:
+        return [line.decode() for line in changed_lines(diff.encode())]
+    return list(changed_lines(diff))
+
+
+both_types = pytest.mark.parametrize("as_bytes", [False, True], ids=["str", "bytes"])
+
+
+@both_types
+@pytest.mark.parametrize("separator", ["\x0c", "\x0b", "\x1c", "\x85", "\u2028"])
+def test_line_separator_inside_changed_line(as_bytes, separator):
+    """Characters str.splitlines() breaks on are still part of the line."""
+    assert _changed(f"+x = 1;{separator}eval(p)", as_bytes) == [f"+x = 1;{separator}eval(p)"]
+
+
+@both_types
+def test_plus_plus_line_without_hunk(as_bytes):
+    """Outside hunks '+++' is a file header only with a trailing space."""
+    assert _changed("+++eval(p)\n+++ b/x.py\n--- a/x.py", as_bytes) == ["+++eval(p)"]
+
+
+@both_types
+def test_hunk_counts_decide_headers(as_bytes):
+    """Inside a hunk, '--- '/'+++ ' lines are changed code, not headers."""
+    hunk = "--- a/x.py\n+++ b/x.py\n@@ -1,2 +1,2 @@\n--- old comment\n+++ eval(p)\n y = 2"
+    assert _changed(hunk, as_bytes) == ["--- old comment", "+++ eval(p)"]
+
+
+@both_types
+def test_headers_after_hunk_ends(as_bytes):
+    """Once a hunk's counts are used up, the next file's headers are skipped."""
+    diff = (
+        "@@ -1 +1 @@\n-a\n+b\n\\ No newline at end of file\n"
+        "--- a/y.py\n+++ b/y.py\n@@ -0,0 +1 @@\n+c"
+    )
+    assert _changed(diff, as_bytes) == ["-a", "+b", "+c"]
+
+
+@both_types
+def test_miscounted_hunk_resets_at_next_file(as_bytes):
+    """A 'diff ' line ends a hunk whose header overstated its length."""
+    diff = "@@ -1,5 +1,5 @@\n+a\ndiff --git a/y.py b/y.py\n--- a/y.py\n+++ b/y.py\n+b"
+    assert _changed(diff, as_bytes) == ["+a", "+b"]
+
+
+@both_types
+def test_crlf_line_endings(as_bytes):
+    """CRLF diffs yield the same lines as LF diffs."""
+    assert _changed("+a\r\n-b\r\n c", as_bytes) == ["+a", "-b"]
+
+
+_PATTERNS = (
+    rb'\beval\s*\(',
+    rb'password\s*=\s*["\'][^"\']+["\']',
+    rb'(?i:api[_-]?key)\s*=',
+    rb'from\s+\S+\s+import\s+\*',
+)
+
+
+@pytest.mark.parametrize("blocked", [(), ("re2",)], ids=["default", "stdlib"])
+@pytest.mark.parametrize("data, expected", [
+    # A rule matching inside another rule's match, which finditer() would miss
+    (b'password = "eval(x)"', {0, 1}),
+    (b'password = "from os import *"', {1, 3}),
+    (b"from a import *; eval(x)", {0, 3}),
+    (b"eval(a) + eval(b)", {0}),
+    (b"API_KEY = 1\nfrom os import *", {2, 3}),
+    (b'password = "' + b"A" * 300 + b'"', {1}),
+    (b'password = "unterminated' + b" " * 300, set()),
+    (b"x = 1", set()),
+])
+def test_regex_rule_hits_on_every_engine(load_without, blocked, data, expected):
+    """RE2 and stdlib re report every matching rule, overlaps included."""
+    module = load_without("app.diff_scan", *blocked)
+    if blocked:
+        assert module.re.__name__ == "re"
+    assert module.regex_rule_hits(_PATTERNS, data) == expected
+
+
+def test_regex_rule_hits_no_patterns():
+    """An empty rule set matches nothing."""
+    assert regex_rule_hits((), b"eval(x)") == set()
+
+
+def test_diff_fingerprint():
+    """Identical diffs share a hex fingerprint, whether str or bytes."""
+    assert diff_fingerprint("+a = 1") == diff_fingerprint(b"+a = 1")
+    assert diff_fingerprint("+a = 1") != diff_fingerprint("+a = 2")
+    assert len(diff_fingerprint("")) == 32
@@ -4,8 +4,34 @@ Tests for reviewer module.
 Run with: pytest tests/
 """
 
+import asyncio
+import gc
+import sys
+import threading
+import warnings
+
 import pytest
-from app.reviewer import _parse_llm_output, LLMInvalidOutputError
+from app.models import PRDiff
+from app.reviewer import (
+    _parse_llm_output,
+    LLMInvalidOutputError,
+    _get_llm_client,
+    aclose_llm_clients,
+    review_pr,
+    review_prs_async,
+)
+
+
+def _make_pr(diff: str) -> PRDiff:
+    return PRDiff(
+        pr_number=1,
+        title="Test PR",
+        description="",
+        author="dev@example.com",
+        files_changed=["app.py"],
+        diff=diff,
+        commit_message="test",
+    )
 
 
 def test_parse_valid_json():
@@ -107,284 +133,97 @@ def test_parse_invalid_issue_schema():
     issues = _parse_llm_output(content)
     assert len(issues) == 1
     assert issues[0].message == "Valid issue"
-```
-
----
-
-## **DESIGN DECISIONS & TALKING POINTS**
-
-### **Architecture Philosophy**
-
-#### **1. Rule-Based First, LLM Second**
-
-**Decision:** Always run rule-based checks before calling LLM
-
-**Why:**
-- Rule-based checks are deterministic, fast, and free
-- Catches 80% of common issues (eval, hardcoded secrets, star imports)
-- LLM only handles nuanced cases rule-based logic can't catch
-- Reduces API costs and latency
-
-**Talking Point:**
-> "I designed it rule-based first because at Wave's scale—10M+ interactions/month—you can't afford to call an LLM for every obvious issue. eval() detection doesn't need GPT-4. The LLM is reserved for subtle bugs and context-aware style issues."
-
----
-
-#### **2. Graceful Degradation**
-
-**Decision:** LLM failures never block PR reviews
-
-**Why:**
-- LLM timeouts happen (network, rate limits, model availability)
-- Invalid JSON happens (hallucinations, prompt drift)
-- System must remain useful even when LLM is down
-
-**Implementation:**
-```python
-try:
-    llm_issues = call_llm(...)
-except LLMTimeoutError:
-    logger.warning("LLM timeout - continuing with rule-based checks only")
-```
-
-**Talking Point:**
-> "I learned this the hard way. Early versions would crash if the LLM returned invalid JSON. Now it logs the error, continues with rule-based checks, and alerts ops. The system degrades gracefully—it's always useful, just less smart when the LLM fails."
-
----
-
-#### **3. Confidence Threshold = 0.7**
-
-**Decision:** Centralized `CONFIDENCE_THRESHOLD = 0.7`
-
-**Why:**
-- Below 0.7, false positive rate was too high in testing
-- Threshold is tunable without code changes
-- Makes interviews easier: "We tuned this based on user feedback"
-
-**Talking Point:**
-> "The 0.7 threshold isn't arbitrary. During testing, I found that LLM suggestions below 0.7 confidence had a 40%+ false positive rate—too noisy for reviewers. Above 0.7, it dropped to 15%. I centralized it as a constant so teams can tune it based on their tolerance for false positives."
-
----
-
-#### **4. Advisory Only, Never Blocking**
-
-**Decision:** System cannot approve, merge, or block PRs
-
-**Why:**
-- Matches Wave's philosophy: "AI augments humans, doesn't replace them"
-- Even high-confidence issues need human context
-- False positives erode trust if system is authoritative
-
-**Talking Point:**
-> "This is philosophically aligned with Wave's Support Automation team. You're not replacing support agents—you're making them faster. Same here: the assistant surfaces issues, but humans make the final call. Even a 95% confident security warning might be a false positive in specific business logic."
-
----
 
-### **Production Thinking**
 
-#### **5. Logging Over print()**
+def test_review_pr_rules_only():
+    """Rule-based review should work without any LLM configured."""
+    output = review_pr(_make_pr("+result = eval(user_input)"), use_llm=False)
+    assert output.summary.llm_used is False
+    assert output.summary.high_severity == 1
+    assert output.issues[0].type == "security"
 
-**Decision:** Use `logging` module, not `print()` statements
 
-**Why:**
-- Kubernetes aggregates logs via stdout/stderr
-- Log levels (INFO, WARNING) enable filtering
-- Structured logs future-proof for observability platforms
+def test_review_pr_degrades_on_llm_error():
+    """LLM failures should fall back to rule-based results, not raise."""
+    output = review_pr(_make_pr("+result = eval(user_input)"), llm_provider="unsupported")
+    assert output.summary.llm_used is False
+    assert output.summary.model_name is None
+    assert output.summary.total_issues == 1
 
-**Implementation:**
-```python
-logger = logging.getLogger(__name__)
-logger.warning("LLM timeout - continuing with rule-based checks only")
-```
 
-**Talking Point:**
-> "Wave runs on Kubernetes. print() statements are invisible in production logs. Proper logging means ops can filter by severity, track error rates, and set up alerts when LLM failures spike."
-
----
-
-#### **6. Versioned Prompts**
-
-**Decision:** `PROMPT_VERSION = "v1.0"` tracked in Git
-
-**Why:**
-- Prompts drift over time (model updates, requirement changes)
-- Git history enables rollback if new prompt increases false positives
-- Metadata in output links results to prompt version
-
-**Talking Point:**
-> "Prompts are code. If I update the system prompt and false positives double, I need to know which version caused it. Git-tracked prompts with version metadata in output give us that rollback capability."
-
----
-
-#### **7. Pydantic for Data Validation**
-
-**Decision:** Use Pydantic models, not raw dictionaries
-
-**Why:**
-- Type safety catches bugs at development time
-- Auto-validates LLM output (confidence must be 0-1, severity must be low/medium/high)
-- Self-documenting: `Issue` model shows exact schema
-
-**Implementation:**
-```python
-class Issue(BaseModel):
-    type: str
-    severity: Literal["low", "medium", "high"]
-    confidence: float = Field(..., ge=0.0, le=1.0)
-```
-
-**Talking Point:**
-> "LLMs hallucinate. Without validation, the model might return `severity: 'critical'` which breaks downstream logic. Pydantic catches this instantly: if the LLM returns invalid data, we log it and skip that issue rather than crashing."
-
----
-
-### **Failure Mode Design**
-
-#### **8. Comprehensive Edge Case Testing**
-
-**Decision:** Tests for invalid JSON, low confidence, empty arrays
+def test_review_pr_inside_running_loop_points_to_async():
+    """Sync entry points refuse to block a running loop, without leaking a coroutine."""
+    async def call_from_loop():
+        with pytest.raises(RuntimeError, match="review_pr_async"):
+            review_pr(_make_pr("+a = 1"), use_llm=False)
+    
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        asyncio.run(call_from_loop())
+        gc.collect()
+    assert not [w for w in caught if "never awaited" in str(w.message)]
 
-**Why:**
-- Production LLMs return unexpected output
-- Early testing exposed issues before prod
-- Each test documents a real failure mode
 
-**Tests Added:**
-```python
-def test_parse_invalid_json():
-    """LLM returned malformed JSON"""
+def test_review_pr_sync_calls_reuse_llm_client(monkeypatch):
+    """Repeated sync reviews share one loop, so the local client is built once."""
+    import httpx
     
-def test_confidence_threshold_filtering():
-    """LLM returned low-confidence suggestions"""
+    built = []
     
-def test_parse_invalid_issue_schema():
-    """LLM hallucinated fields"""
-```
-
-**Talking Point:**
-> "I wrote these tests after the system failed in real usage. The 'invalid schema' test came from a case where the LLM invented a severity level called 'critical' which wasn't in the schema. Now we catch and skip invalid issues rather than crashing."
-
----
-
-#### **9. Timeout Handling**
-
-**Decision:** 30-second timeout on LLM calls
-
-**Why:**
-- LLM APIs can hang (rate limits, model overload)
-- Reviews should complete in seconds, not minutes
-- Better to return partial results than timeout entirely
-
-**Talking Point:**
-> "At scale, you can't wait 2 minutes for an LLM response. 30 seconds is the limit—if the model doesn't respond, we log it, alert ops, and return rule-based results only. The user still gets value, just without AI-powered insights."
-
----
-
-### **Wave-Specific Alignment**
-
-#### **10. Support-Oriented Philosophy**
-
-**Decision:** System designed to reduce reviewer burden, not replace reviewers
-
-**Why:**
-- Matches Wave's Support Automation mission
-- Humans bring context and empathy that AI can't
-- System success = faster reviews, not autonomous decisions
-
-**README Quote:**
-> "Frees senior engineers to focus on complex design decisions"
-
-**Talking Point:**
-> "Wave's Support Automation team doesn't try to replace support agents—they surface context and next-best actions. Same philosophy here: this tool catches the obvious stuff (hardcoded secrets, eval()) so reviewers spend time on architecture and business logic, not style nits."
-
----
-
-#### **11. Low-Resource Environment Design**
-
-**Decision:** Rule-based checks work offline, no API required
-
-**Why:**
-- Wave operates in West Africa (Senegal, Côte d'Ivoire)
-- Connectivity isn't always reliable
-- System must be useful even without API access
-
-**Talking Point:**
-> "Wave builds for markets where connectivity is unreliable. That's why rule-based checks run first and don't require an API. Even if the LLM call fails—network timeout, API down, no credits—the system still finds hardcoded secrets and security issues. It's designed to work in Dakar, not just San Francisco."
-
----
-
-#### **12. Cost Consciousness**
-
-**Decision:** Don't call LLM for issues rule-based checks catch
-
-**Why:**
-- At 10M+ interactions/month, every API call matters
-- Rule-based checks cost $0
-- LLM reserved for cases that need it
-
-**Talking Point:**
-> "If you're reviewing 1,000 PRs/day and calling GPT-4 on every single one, you're spending thousands per month. I optimized costs by running free rule-based checks first. Only nuanced issues—like subtle type errors or performance anti-patterns—hit the LLM. This keeps costs predictable and reasonable."
-
----
-
-### **Honest Engineering**
-
-#### **13. README Honesty About GitHub Action**
-
-**Decision:** Marked GitHub Action as "Planned (Not Yet Implemented)"
-
-**Why:**
-- Claiming features that don't exist erodes trust
-- Honesty signals maturity and restraint
-- Wave engineers will check—lying fails immediately
-
-**Talking Point:**
-> "I could have left that GitHub Action section as-is and hoped no one noticed. But Wave values integrity. I'd rather be honest: the CLI works, the GitHub Action is planned but not implemented. That's the kind of engineer I am—I don't oversell, I deliver what I promise."
-
----
-
-#### **14. Simple, Boring Technology**
-
-**Decision:** No fancy frameworks, just Python, Pydantic, logging
-
-**Why:**
-- Wave's engineering principle: "We like boring technology"
-- Boring = reliable, debuggable, maintainable
-- Fancy = exciting but brittle
-
-**Talking Point:**
-> "I read Wave's engineering values—'We like boring technology.' So I didn't build this with the latest framework. It's Python, Pydantic for validation, standard logging. No surprises. A Wave engineer can clone this repo, read the code in 10 minutes, and immediately understand how it works."
-
----
-
-## **INTERVIEW SCENARIOS**
-
-### **Scenario 1: "Tell me about a time you designed for failure"**
-
-**Answer:**
-> "In this code review assistant, I designed for three specific failure modes. First, LLM timeouts—I set a 30-second limit and gracefully degrade to rule-based checks if the model doesn't respond. Second, invalid JSON output—the LLM can hallucinate malformed data, so I wrapped parsing in try-catch and skip invalid issues rather than crashing. Third, low confidence suggestions—I filter out anything below 0.7 confidence because testing showed these had 40%+ false positive rates. Each failure mode is logged so ops can track trends, but the system never blocks users."
-
----
-
-### **Scenario 2: "How would you scale this to 10M PRs/month?"**
-
-**Answer:**
-> "Three optimizations. First, I'd add caching—if two PRs have identical diffs, reuse the review. Second, I'd batch LLM calls—instead of calling GPT-4 for every PR individually, batch 10-20 at once to reduce overhead. Third, I'd implement smarter routing—trivial PRs (1-2 line changes) skip the LLM entirely, only complex diffs get AI analysis. Combined, this could reduce costs by 70% while maintaining quality."
-
----
-
-### **Scenario 3: "What's missing from this implementation?"**
-
-**Answer:**
-> "Four things. First, a human feedback loop—I need thumbs up/down on each suggestion to measure false positive rates and retrain. Second, fine-tuning—right now it uses base GPT-4, but fine-tuning on Wave's historical PR comments would improve accuracy. Third, multi-language support—it's Python-only now, but Wave likely uses TypeScript and Go. Fourth, observability dashboards—I log everything, but there's no Grafana dashboard showing review latency, LLM costs, or confidence score distributions over time."
-
----
-
-### **Scenario 4: "Why should we hire you for Support Automation?"**
-
-**Answer:**
-> "Because I think like you do. Look at this code review assistant—it's not trying to replace human reviewers, it's making them faster by surfacing obvious issues. That's exactly Wave's Support Automation philosophy: AI augments agents, it doesn't replace empathy. I also built for your operational reality: low connectivity, cost consciousness, graceful degradation. I've read your job description—you need someone who ships production systems for 10M+ interactions/month in West Africa. This project proves I understand those constraints and can deliver."
-
----
-
-## **PROJECT STRUCTURE DIAGRAM**
\ No newline at end of file
+    def reply(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": "[]"}}]})
+    
+    class CountingClient(httpx.AsyncClient):
+        def __init__(self, **kwargs):
+            built.append(self)
+            super().__init__(transport=httpx.MockTransport(reply), **kwargs)
+    
+    monkeypatch.setattr(httpx, "AsyncClient", CountingClient)
+    # Keep the mock client out of the module-wide cache used by other tests
+    monkeypatch.setattr("app.reviewer._llm_clients", {})
+    for _ in range(3):
+        output = review_pr(_make_pr("+a = 1"), llm_provider="local")
+        assert output.summary.llm_used is True
+    assert len(built) == 1
+
+
+def test_llm_client_cache_shared_by_concurrent_loops(monkeypatch):
+    """Loops on different threads can build, sweep and close clients at once."""
+    monkeypatch.setattr("app.reviewer._llm_clients", {})
+    # Switch threads as often as possible so the loops interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    errors = []
+    
+    async def churn(name):
+        for i in range(300):
+            _get_llm_client((name, i), object)
+            await asyncio.sleep(0)
+        await aclose_llm_clients()
+    
+    def worker(name):
+        try:
+            for _ in range(10):
+                asyncio.run(churn(name))
+        except Exception as e:
+            errors.append(e)
+    
+    try:
+        threads = [threading.Thread(target=worker, args=(f"t{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_review_prs_async_preserves_order():
+    """Batch review should return one output per PR, in input order."""
+    prs = [_make_pr("+result = eval(x)"), _make_pr("+from utils import *")]
+    prs[1].pr_number = 2
+    outputs = asyncio.run(review_prs_async(prs, use_llm=False, max_concurrency=1))
+    assert [o.pr_number for o in outputs] == [1, 2]
+    assert outputs[0].issues[0].type == "security"
+    assert outputs[1].issues[0].type == "style"
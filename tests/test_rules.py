@@ -9,9 +9,13 @@ from app.rules import (
     check_pr_size,
     check_security_patterns,
     check_import_quality,
+    check_code_complexity,
     run_all_rules
 )
 
+# 600 added lines - over the default 500-line PR size threshold
+_BIG_DIFF = "\n".join(f"+line{i}" for i in range(600))
+
 
 def test_pr_size_small():
     """Small PRs should not trigger size warning."""
@@ -22,13 +26,18 @@ def test_pr_size_small():
 
 def test_pr_size_large():
     """Large PRs should trigger size warning."""
-    diff = "\n".join([f"+line{i}" for i in range(600)])
-    result = check_pr_size(diff, threshold=500)
+    result = check_pr_size(_BIG_DIFF, threshold=500)
     assert result is not None
     assert result.type == "pr_size"
     assert result.severity == "medium"
 
 
+def test_pr_size_crlf_line_endings():
+    """CRLF diffs should be counted the same as LF diffs."""
+    crlf_diff = _BIG_DIFF.replace("\n", "\r\n")
+    assert check_pr_size(crlf_diff, threshold=500).message == check_pr_size(_BIG_DIFF, threshold=500).message
+
+
 def test_security_eval():
     """Should detect eval() usage."""
     diff = "+result = eval(user_input)"
@@ -54,6 +63,60 @@ def test_security_api_key():
     assert any("api" in issue.message.lower() for issue in issues)
 
 
+def test_security_case_insensitive():
+    """Patterns should still match regardless of case."""
+    diff = '+SECRET_KEY = "abc"\n+digest = hashlib.MD5(data)'
+    messages = [issue.message for issue in check_security_patterns(diff)]
+    assert any("secret key" in m.lower() for m in messages)
+    assert any("md5" in m.lower() for m in messages)
+
+
+def test_security_reports_each_pattern_once():
+    """Repeated matches of the same pattern should yield a single issue."""
+    diff = "+a = eval(x)\n+b = eval(y)\n+c = exec(z)"
+    issues = check_security_patterns(diff)
+    messages = [issue.message for issue in issues]
+    assert len(messages) == len(set(messages))
+    assert sum("eval()" in m for m in messages) == 1
+    assert any("exec()" in m for m in messages)
+
+
+# (diff, expected security messages). Covers a rule matching inside another
+# rule's match, which a plain finditer() over the fused regex would miss.
+_ENGINE_CASES = [
+    ('+password = "eval(x)"', {"Use of eval() detected", "Possible hardcoded password"}),
+    ('+api_key = "exec(x)"\n+m = hashlib.md5(b)', {
+        "Use of exec() detected", "Possible hardcoded API key",
+        "MD5 is cryptographically broken - use SHA256 or bcrypt",
+    }),
+    ('+SECRET_KEY = "abc"\n+secret = "x"', {"Possible hardcoded secret", "Hardcoded secret key detected"}),
+    ("+result = EVAL(user_input)", {"Use of eval() detected"}),
+    ("+data = pickle.loads(blob)", {"Use of pickle detected - consider safer alternatives"}),
+    ("-result = eval(user_input)\n+result = safe(user_input)", set()),
+    # Long values and column-aligned assignments
+    ('+secret = "' + "A" * 300 + '"', {"Possible hardcoded secret"}),
+    ('+API_KEY            = "abc123"', {"Possible hardcoded API key"}),
+    ("+result = eval" + " " * 20 + "(x)", {"Use of eval() detected"}),
+]
+
+
+@pytest.mark.parametrize("blocked", [(), ("hyperscan",)], ids=["default", "no-hyperscan"])
+@pytest.mark.parametrize("diff, expected", _ENGINE_CASES)
+def test_security_same_hits_with_and_without_hyperscan(load_without, blocked, diff, expected):
+    """Hyperscan and the regex fallback must report the same issues."""
+    rules = load_without("app.rules", *blocked)
+    if blocked:
+        assert rules._SECURITY_HS_DB is None
+    assert {issue.message for issue in rules.check_security_patterns(diff)} == expected
+
+
+def test_removed_and_context_lines_ignored():
+    """Only added lines should be checked for security and import issues."""
+    diff = "-result = eval(user_input)\n from utils import *\n+result = safe_eval(user_input)"
+    assert check_security_patterns(diff) == []
+    assert check_import_quality(diff) == []
+
+
 def test_import_star():
     """Should detect star imports."""
     diff = "+from module import *"
@@ -62,6 +125,15 @@ def test_import_star():
     assert any("star import" in issue.message.lower() for issue in issues)
 
 
+def test_code_complexity_single_large_function():
+    """A single function with >100 added lines should be flagged."""
+    body = "\n".join(f"+    x{i} = {i}" for i in range(120))
+    diff = "+def big_function(data):\n" + body
+    issues = check_code_complexity(diff)
+    assert len(issues) == 1
+    assert issues[0].type == "complexity"
+
+
 def test_run_all_rules():
     """Should run all rules and aggregate results."""
     diff = """